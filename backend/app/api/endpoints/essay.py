@@ -4,15 +4,18 @@ from app.schemas.essay import EssaySubmission
 from app.services.ai_service import (
     get_question_type_from_ai,
     grade_essay_with_ai,
-    grade_essay_with_expert_diagnosis,
+    iter_expert_diagnosis,
     get_ai_service_status,
     clean_unicode_text,
     convert_diagnosis_to_score_details,
+    normalize_score,
 )
 from app.core.config import settings
 import logging
 import json
 import asyncio
+import re
+from typing import Optional
 from app.services.history_service import (
     append_history,
     list_history,
@@ -23,6 +26,31 @@ from app.services.history_service import (
 router = APIRouter()
 logger = logging.getLogger(__name__)
 
+# 上游AI异常分类：一次扫描错误信息，按组名映射到对外的HTTP错误
+_AI_ERROR_RE = re.compile(
+    r"(?P<auth>api_key|authentication|unauthorized)"
+    r"|(?P<net>connection|timeout|network)"
+    r"|(?P<rate>rate_limit|quota)"
+    r"|(?P<model>model_not_found)",
+    re.IGNORECASE,
+)
+# 按优先级排列（同一信息命中多类时取靠前者）
+_AI_ERROR_RESPONSES = {
+    "auth": (503, "AI 认证异常，请稍后重试"),
+    "net": (504, "网络超时，请稍后重试"),
+    "rate": (429, "请求过多，请稍后再试"),
+    "model": (503, "AI 模型不可用，请联系管理员"),
+}
+
+
+def classify_ai_error(e: Exception) -> Optional[HTTPException]:
+    """Map a known upstream AI failure to an HTTPException; None if unrecognized."""
+    categories = {m.lastgroup for m in _AI_ERROR_RE.finditer(str(e))}
+    for category, (status_code, detail) in _AI_ERROR_RESPONSES.items():
+        if category in categories:
+            return HTTPException(status_code=status_code, detail=detail)
+    return None
+
 
 def final_insurance_scan(response_data: dict) -> dict:
     """Final light cleanup to avoid over-trimming user-visible content."""
@@ -62,8 +90,8 @@ async def grade_essay_progressive(submission: EssaySubmission):
     """
     try:
         logger.info("=== 开始双阶段AI专家评分 ===")
-        logger.info(f"Content length: {len(submission.content)}")
-        logger.info(f"Requested type: {submission.question_type}")
+        logger.info("Content length: %s", len(submission.content))
+        logger.info("Requested type: %s", submission.question_type)
 
         # Determine question type if not provided
         question_type = submission.question_type
@@ -72,15 +100,14 @@ async def grade_essay_progressive(submission: EssaySubmission):
             logger.info("Question type not provided; asking AI to recognize type...")
             question_type = await get_question_type_from_ai(submission.content)
             question_type_source = "ai"
-            logger.info(f"Type recognized: {question_type}")
+            logger.info("Type recognized: %s", question_type)
 
         async def generate_progressive_response():
+            stages = iter_expert_diagnosis(submission.content, question_type)
             try:
                 # ===== 第一阶段：专业诊断 (进度50%) =====
                 logger.info("第一阶段：AI专家诊断开始...")
-                diagnosis_data, evaluation_data = await grade_essay_with_expert_diagnosis(
-                    submission.content, question_type
-                )
+                _, diagnosis_data = await anext(stages)
                 
                 # 将诊断结果转换为评分细则格式
                 diagnosis_score_details = convert_diagnosis_to_score_details(diagnosis_data)
@@ -100,19 +127,16 @@ async def grade_essay_progressive(submission: EssaySubmission):
                     "teacherComments": diagnosis_data.get("teacher_comments", ""),
                     "partial": True  # 标记为部分结果
                 }
+                # 诊断完成即推送，不等待第二阶段生成
                 # Encode explicitly to UTF-8 to avoid client-side decode errors
                 yield (f"data: {json.dumps(stage1_response, ensure_ascii=False)}\n\n").encode("utf-8", errors="replace")
                 
                 # ===== 第二阶段：整体评价 (进度100%) =====
                 logger.info("第二阶段：整体评价生成...")
+                _, evaluation_data = await anext(stages)
                 
                 # 获取总分和评价
-                total_score = evaluation_data.get("total_score", 75.0)
-                try:
-                    total_score = float(total_score)
-                    total_score = max(0, min(100, total_score))
-                except (ValueError, TypeError):
-                    total_score = 75.0
+                total_score = normalize_score(evaluation_data.get("total_score", 75.0))
                 
                 # 获取整体评价作为feedback
                 overall_evaluation = evaluation_data.get("overall_evaluation", "AI专家已完成综合评估，请参考详细的专业诊断意见")
@@ -172,6 +196,9 @@ async def grade_essay_progressive(submission: EssaySubmission):
                     "partial": False
                 }
                 yield (f"data: {json.dumps(error_response, ensure_ascii=False)}\n\n").encode("utf-8", errors="replace")
+            finally:
+                # 阶段失败或客户端断开时，确保诊断生成器被及时关闭
+                await stages.aclose()
 
         # Proper SSE response: ensure correct media type and disable buffering
         return StreamingResponse(
@@ -187,15 +214,9 @@ async def grade_essay_progressive(submission: EssaySubmission):
 
     except Exception as e:
         logger.error(f"Progressive grading setup failed: {str(e)}")
-        err = str(e).lower()
-        if "api_key" in err or "authentication" in err or "unauthorized" in err:
-            raise HTTPException(status_code=503, detail="AI 认证异常，请稍后重试")
-        if "connection" in err or "timeout" in err or "network" in err:
-            raise HTTPException(status_code=504, detail="网络超时，请稍后重试")
-        if "rate_limit" in err or "quota" in err:
-            raise HTTPException(status_code=429, detail="请求过多，请稍后再试")
-        if "model_not_found" in err:
-            raise HTTPException(status_code=503, detail="AI 模型不可用，请联系管理员")
+        classified = classify_ai_error(e)
+        if classified is not None:
+            raise classified
         raise HTTPException(status_code=500, detail="服务异常，请稍后再试")
 
 
@@ -207,8 +228,8 @@ async def grade_essay(submission: EssaySubmission):
     """
     try:
         logger.info("=== Start grading ===")
-        logger.info(f"Content length: {len(submission.content)}")
-        logger.info(f"Requested type: {submission.question_type}")
+        logger.info("Content length: %s", len(submission.content))
+        logger.info("Requested type: %s", submission.question_type)
 
         # Determine question type if not provided
         question_type = submission.question_type
@@ -217,7 +238,7 @@ async def grade_essay(submission: EssaySubmission):
             logger.info("Question type not provided; asking AI to recognize type...")
             question_type = await get_question_type_from_ai(submission.content)
             question_type_source = "ai"
-            logger.info(f"Type recognized: {question_type}")
+            logger.info("Type recognized: %s", question_type)
 
         # Main grading
         result = await grade_essay_with_ai(
@@ -225,7 +246,8 @@ async def grade_essay(submission: EssaySubmission):
             question_type=question_type
         )
         logger.info(
-            f"Graded - score: {result.score}, details: {len(result.scoreDetails) if result.scoreDetails else 0}"
+            "Graded - score: %s, details: %s",
+            result.score, len(result.scoreDetails) if result.scoreDetails else 0
         )
 
         # Use scoreDetails returned by service/model as-is (no regeneration)
@@ -267,15 +289,9 @@ async def grade_essay(submission: EssaySubmission):
         logger.error(f"Error type: {type(e).__name__}")
         import traceback
         logger.error(f"Traceback: {traceback.format_exc()}")
-        err = str(e).lower()
-        if "api_key" in err or "authentication" in err or "unauthorized" in err:
-            raise HTTPException(status_code=503, detail="AI 认证异常，请稍后重试")
-        if "connection" in err or "timeout" in err or "network" in err:
-            raise HTTPException(status_code=504, detail="网络超时，请稍后重试")
-        if "rate_limit" in err or "quota" in err:
-            raise HTTPException(status_code=429, detail="请求过多，请稍后再试")
-        if "model_not_found" in err:
-            raise HTTPException(status_code=503, detail="AI 模型不可用，请联系管理员")
+        classified = classify_ai_error(e)
+        if classified is not None:
+            raise classified
         # 开发环境：返回结构化的兜底结果，避免前端 500 阻塞调试
         if settings.DEBUG:
             fallback_score = 75.0
@@ -32,6 +32,19 @@ UPLOAD_DIR = "uploads"
 os.makedirs(UPLOAD_DIR, exist_ok=True)
 
 
+def _resolve_within(images_dir: str, image_filename: str) -> Optional[str]:
+    """把图片相对路径解析到 images_dir 下；解析结果跳出该目录（..、绝对路径、Windows 盘符相对路径等）时返回 None"""
+    base = os.path.realpath(images_dir)
+    resolved = os.path.realpath(os.path.join(images_dir, image_filename))
+    try:
+        if os.path.commonpath([resolved, base]) != base:
+            return None
+    except ValueError:
+        # 不同盘符或绝对/相对路径混用，无法比较
+        return None
+    return resolved
+
+
 @router.post("/upload", response_model=dict)
 async def upload_document(
     file: UploadFile = File(...),
@@ -504,15 +517,19 @@ async def get_question(question_id: str, db: Session = Depends(get_db)):
     }
 
 
-@router.get("/images/{image_filename}")
+@router.get("/images/{image_filename:path}")
 async def get_image(image_filename: str):
-    """获取图片文件"""
+    """获取图片文件（image_filename 可带分片目录，如 ab/cd/xxx.png）"""
     import logging
     
+    # 允许分片子目录，但解析后的路径必须仍在图片目录内
+    image_path = _resolve_within(os.path.join(UPLOAD_DIR, "images"), image_filename)
+    if image_path is None:
+        raise HTTPException(status_code=400, detail="非法的图片路径")
+    
     # 调试信息
     current_dir = os.getcwd()
     upload_dir_abs = os.path.abspath(UPLOAD_DIR)
-    image_path = os.path.join(UPLOAD_DIR, "images", image_filename)
     image_path_abs = os.path.abspath(image_path)
     
     logging.info(f"🔍 图片请求: {image_filename}")
@@ -525,14 +542,17 @@ async def get_image(image_filename: str):
     
     if not os.path.exists(image_path):
         # 尝试不同的路径
-        alt_paths = [
-            os.path.join("backend", UPLOAD_DIR, "images", image_filename),
-            os.path.join("..", UPLOAD_DIR, "images", image_filename),
-            os.path.join(os.path.dirname(__file__), "..", "..", "..", UPLOAD_DIR, "images", image_filename)
+        alt_images_dirs = [
+            os.path.join("backend", UPLOAD_DIR, "images"),
+            os.path.join("..", UPLOAD_DIR, "images"),
+            os.path.join(os.path.dirname(__file__), "..", "..", "..", UPLOAD_DIR, "images")
         ]
         
-        for alt_path in alt_paths:
-            logging.info(f"🔍 尝试路径: {os.path.abspath(alt_path)} - 存在: {os.path.exists(alt_path)}")
+        for alt_images_dir in alt_images_dirs:
+            alt_path = _resolve_within(alt_images_dir, image_filename)
+            if alt_path is None:
+                continue
+            logging.info(f"🔍 尝试路径: {alt_path} - 存在: {os.path.exists(alt_path)}")
             if os.path.exists(alt_path):
                 image_path = alt_path
                 break
@@ -633,15 +653,22 @@ async def clear_all_questions(
         
         # 清理空目录和临时文件
         try:
-            # 删除所有剩余的图片文件（防止有遗漏的）
+            # 删除所有剩余的图片文件（防止有遗漏的），包括分片子目录中的
             if os.path.exists(images_dir):
                 for file_pattern in ['*.jpg', '*.jpeg', '*.png', '*.gif']:
-                    for file_path in glob.glob(os.path.join(images_dir, file_pattern)):
+                    for file_path in glob.glob(os.path.join(images_dir, '**', file_pattern), recursive=True):
                         try:
                             os.remove(file_path)
                             deleted_files += 1
                         except:
                             pass
+                # 自底向上移除已清空的分片目录
+                for dir_path, _, _ in os.walk(images_dir, topdown=False):
+                    if dir_path != images_dir:
+                        try:
+                            os.rmdir(dir_path)
+                        except OSError:
+                            pass
         except Exception as e:
             print(f"清理图片目录失败: {str(e)}")
         
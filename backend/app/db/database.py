@@ -1,3 +1,6 @@
+import json
+
+import orjson
 from sqlalchemy import create_engine
 from sqlalchemy.orm import declarative_base, sessionmaker
 from app.core.config import settings
@@ -5,15 +8,30 @@ from app.core.config import settings
 # Prefer env-configured URL; fall back to local SQLite for out-of-the-box dev.
 DATABASE_URL = settings.DATABASE_URL or "sqlite:///./dev.db"
 
+
+def dumps_json(obj, ensure_ascii: bool = True) -> str:
+    # orjson for speed; stdlib json for what orjson rejects (e.g. ints wider than 64 bits).
+    # orjson always emits raw UTF-8; ensure_ascii only applies to the stdlib fallback.
+    try:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS).decode("utf-8")
+    except TypeError:
+        return json.dumps(obj, ensure_ascii=ensure_ascii)
+
+
+# JSON/JSONB column writes (e.g. history payloads) go through orjson; reads stay on
+# stdlib json, which keeps big integers exact where orjson would turn them into floats
+_json_options = {"json_serializer": dumps_json}
+
 # Create engine with sensible defaults for sqlite
 if DATABASE_URL.startswith("sqlite"):
     engine = create_engine(
         DATABASE_URL,
         connect_args={"check_same_thread": False},
-        pool_pre_ping=True
+        pool_pre_ping=True,
+        **_json_options
     )
 else:
-    engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+    engine = create_engine(DATABASE_URL, pool_pre_ping=True, **_json_options)
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
 # SQLAlchemy 2.0 style import to avoid MovedIn20 deprecation warnings.
@@ -5,6 +5,7 @@ import traceback
 import logging
 from app.api.endpoints import essay
 from .api.endpoints import question, assessment, practice
+from .services.ai_service import close_openai_client
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
@@ -119,6 +120,11 @@ async def root():
 async def admin_root():
     return RedirectResponse(url="/api/v1/questions/admin/dashboard")
 
+# Release pooled upstream AI connections on shutdown
+@app.on_event("shutdown")
+async def close_ai_client():
+    await close_openai_client()
+
 # Health check endpoint
 @app.get("/health")
 async def health_check():
@@ -6,13 +6,14 @@
 确保所有内容都是AI生成，无模板化代码
 """
 
-import json
 import logging
 import re
 import sys
 import traceback
-from typing import Optional, List
-from openai import AsyncOpenAI
+from typing import AsyncIterator, Optional, List, Tuple
+import httpx
+import orjson
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient
 from ..core.config import settings
 from ..schemas.essay import EssayGradingResult, ScoreDetail, DetailedScoreDetail, ScorePoint
 from .prompt_service_simple import (
@@ -24,28 +25,76 @@ from .prompt_service import extract_chapter_content
 
 logger = logging.getLogger(__name__)
 
+# 进程内复用的OpenAI客户端（保持长连接，避免每次请求重新握手）
+_openai_client: Optional[AsyncOpenAI] = None
+_openai_client_config: Optional[Tuple[str, str]] = None
+
+
+async def get_openai_client() -> AsyncOpenAI:
+    """获取共享的AsyncOpenAI客户端；配置变化（如热重载）时重建
+
+    旧客户端不在此处关闭：其他协程可能仍在使用它进行流式请求，
+    由其引用释放后自然回收，进程退出时由 close_openai_client 关闭当前客户端
+    """
+    global _openai_client, _openai_client_config
+    config = (settings.openai_api_key, settings.openai_api_base)
+    if _openai_client is not None and _openai_client_config == config:
+        return _openai_client
+
+    _openai_client = AsyncOpenAI(
+        api_key=config[0],
+        base_url=config[1],
+        default_headers={
+            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+        },
+        http_client=DefaultAsyncHttpxClient(
+            limits=httpx.Limits(max_keepalive_connections=32, max_connections=64)
+        ),
+    )
+    _openai_client_config = config
+    return _openai_client
+
+
+async def close_openai_client() -> None:
+    """关闭共享的OpenAI客户端（应用关闭时调用）"""
+    global _openai_client, _openai_client_config
+    if _openai_client is not None:
+        client = _openai_client
+        _openai_client = None
+        _openai_client_config = None
+        await client.close()
+
+
+# 特殊Unicode字符替换表（模块加载时构建一次）
+_UNICODE_CLEAN_TABLE = str.maketrans({
+    '\u2014': '--',  # 长破折号
+    '\u2013': '-',   # 短破折号
+    '\u2018': "'",   # 左单引号
+    '\u2019': "'",   # 右单引号
+    '\u201c': '"',   # 左双引号
+    '\u201d': '"',   # 右双引号
+    '\u2026': '...',  # 省略号
+    '\u00a0': ' ',   # 不间断空格
+    '\u2022': '•',   # 项目符号
+})
+
 
 def clean_unicode_text(text: str) -> str:
     """清理文本中的特殊Unicode字符"""
     if not text:
         return text
-        
-    replacements = {
-        '\u2014': '--',  # 长破折号
-        '\u2013': '-',   # 短破折号
-        '\u2018': "'",   # 左单引号
-        '\u2019': "'",   # 右单引号
-        '\u201c': '"',   # 左双引号
-        '\u201d': '"',   # 右双引号
-        '\u2026': '...',  # 省略号
-        '\u00a0': ' ',   # 不间断空格
-        '\u2022': '•',   # 项目符号
-    }
-    
-    for unicode_char, replacement in replacements.items():
-        text = text.replace(unicode_char, replacement)
-    
-    return text
+    return text.translate(_UNICODE_CLEAN_TABLE)
+
+
+def normalize_score(score, default: float = 75.0) -> float:
+    """将AI返回的分数规范为0-100之间的浮点数，无法解析时返回默认分"""
+    # 常见情况：AI直接返回合法数值，无需走异常分支
+    if isinstance(score, (int, float)) and 0 <= score <= 100:
+        return float(score)
+    try:
+        return max(0.0, min(100.0, float(score)))
+    except (ValueError, TypeError):
+        return default
 
 
 def convert_emoji_to_blue_html(text: str) -> str:
@@ -144,7 +193,7 @@ def extract_answer_from_reasoning(reasoning_content: str) -> str:
             
             # 如果上下文包含确定性词汇，认为是答案
             if any(keyword in context for keyword in ["that's", "答案", "是", "应该", "判断", "选择"]):
-                logger.info(f"从reasoning中提取到答案: {question_type}")
+                logger.info("从reasoning中提取到答案: %s", question_type)
                 return question_type
     
     # 如果没有找到明确答案，尝试从推理逻辑中推断
@@ -211,29 +260,48 @@ def clean_ai_thinking_patterns(text: str) -> str:
     return text.strip()
 
 
-async def grade_essay_with_expert_diagnosis(essay_content: str, question_type: Optional[str] = None) -> tuple:
+async def _create_chat_completion(client: AsyncOpenAI, stream: bool = True, **kwargs) -> str:
+    """调用chat completion并返回完整文本
+
+    stream=True 时以流式方式接收增量内容并拼接，首个token到达即开始接收，
+    避免长输出时整段空等；stream=False 保留原有的一次性聚合调用。
     """
-    双阶段AI专家诊断式评分
-    第一阶段：专业阅卷老师逐句诊断
-    第二阶段：基于诊断生成整体评价
-    
-    Returns:
-        tuple: (第一阶段诊断结果, 第二阶段评价结果)
+    if not stream:
+        response = await client.chat.completions.create(**kwargs)
+        return response.choices[0].message.content
+
+    chunks = []
+    completion_stream = await client.chat.completions.create(stream=True, **kwargs)
+    async for chunk in completion_stream:
+        if not chunk.choices:
+            continue
+        delta = chunk.choices[0].delta
+        if delta is not None and delta.content:
+            chunks.append(delta.content)
+    return "".join(chunks)
+
+
+async def iter_expert_diagnosis(
+    essay_content: str,
+    question_type: Optional[str] = None,
+    stream: bool = True,
+) -> AsyncIterator[Tuple[str, dict]]:
+    """
+    双阶段AI专家诊断式评分（异步生成器版本）
+    第一阶段完成后立即产出 ("diagnosis", 诊断结果)，
+    第二阶段完成后产出 ("evaluation", 评价结果)，
+    便于接口在第二阶段生成期间先把诊断结果推送给前端
     """
     try:
-        client = AsyncOpenAI(
-            api_key=settings.openai_api_key,
-            base_url=settings.openai_api_base,
-            default_headers={
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-            }
-        )
+        client = await get_openai_client()
         
         # ===== 第一阶段：专业诊断 =====
         diagnosis_prompt = create_expert_diagnosis_prompt(essay_content, question_type or "概括题")
         
         logger.info("开始第一阶段：AI专家诊断分析...")
-        diagnosis_response = await client.chat.completions.create(
+        diagnosis_content = await _create_chat_completion(
+            client,
+            stream=stream,
             model=settings.openai_model_name,
             messages=[
                 {
@@ -245,7 +313,6 @@ async def grade_essay_with_expert_diagnosis(essay_content: str, question_type: O
             max_tokens=4096
         )
         
-        diagnosis_content = diagnosis_response.choices[0].message.content
         if not diagnosis_content:
             raise ValueError("第一阶段AI诊断返回空响应")
         
@@ -260,13 +327,17 @@ async def grade_essay_with_expert_diagnosis(essay_content: str, question_type: O
                 "teacher_comments": clean_ai_thinking_patterns(diagnosis_content)[:800]
             }
         
+        yield "diagnosis", diagnosis_data
+        
         # ===== 第二阶段：整体评价 =====
         evaluation_prompt = create_overall_evaluation_prompt(
             diagnosis_data, essay_content, question_type or "概括题"
         )
         
         logger.info("开始第二阶段：整体评价生成...")
-        evaluation_response = await client.chat.completions.create(
+        evaluation_content = await _create_chat_completion(
+            client,
+            stream=stream,
             model=settings.openai_model_name,
             messages=[
                 {
@@ -278,15 +349,15 @@ async def grade_essay_with_expert_diagnosis(essay_content: str, question_type: O
             max_tokens=2048
         )
         
-        evaluation_content = evaluation_response.choices[0].message.content
         if not evaluation_content:
             raise ValueError("第二阶段整体评价返回空响应")
         
         # 解析第二阶段结果（容错）
         try:
             evaluation_data = parse_ai_json_response(evaluation_content, "评价阶段", question_type or "概括题")
-            logger.info("评价阶段JSON解析成功，overall_evaluation: {}".format(
-                str(evaluation_data.get("overall_evaluation", ""))[:100]))
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("评价阶段JSON解析成功，overall_evaluation: %s",
+                            str(evaluation_data.get("overall_evaluation", ""))[:100])
         except Exception as parse_err2:
             logger.warning("评价阶段JSON解析失败，使用回退方案: {}".format(str(parse_err2)[:200]))
             evaluation_data = {
@@ -297,13 +368,32 @@ async def grade_essay_with_expert_diagnosis(essay_content: str, question_type: O
                 "final_comments": ""
             }
         
-        return diagnosis_data, evaluation_data
+        yield "evaluation", evaluation_data
         
     except Exception as e:
         logger.error("双阶段AI诊断失败: {}".format(str(e)))
         raise Exception("AI专家诊断服务暂时不可用: {}".format(str(e)[:100]))
 
 
+async def grade_essay_with_expert_diagnosis(
+    essay_content: str,
+    question_type: Optional[str] = None,
+    stream: bool = True,
+) -> tuple:
+    """
+    双阶段AI专家诊断式评分
+    第一阶段：专业阅卷老师逐句诊断
+    第二阶段：基于诊断生成整体评价
+    
+    Returns:
+        tuple: (第一阶段诊断结果, 第二阶段评价结果)
+    """
+    results = {}
+    async for stage, data in iter_expert_diagnosis(essay_content, question_type, stream=stream):
+        results[stage] = data
+    return results["diagnosis"], results["evaluation"]
+
+
 async def grade_essay_with_ai(essay_content: str, question_type: Optional[str] = None) -> EssayGradingResult:
     """
     新的双阶段AI专家评分主函数
@@ -316,16 +406,12 @@ async def grade_essay_with_ai(essay_content: str, question_type: Optional[str] =
         )
         
         # 获取总分
-        total_score = evaluation_data.get("total_score", 75.0)
-        try:
-            total_score = float(total_score)
-            total_score = max(0, min(100, total_score))
-        except (ValueError, TypeError):
-            total_score = 75.0
+        total_score = normalize_score(evaluation_data.get("total_score", 75.0))
         
         # 获取整体评价 - 特殊处理，避免误杀正常内容
         overall_evaluation = evaluation_data.get("overall_evaluation", "AI批改完成")
-        logger.info("原始overall_evaluation: {}".format(str(overall_evaluation)[:150]))
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("原始overall_evaluation: %s", str(overall_evaluation)[:150])
         
         # 如果是从JSON正确解析出来的评价内容，不要过度清理
         if overall_evaluation and overall_evaluation != "AI批改完成":
@@ -408,17 +494,17 @@ async def grade_essay_with_ai(essay_content: str, question_type: Optional[str] =
         # 如果评分细则有数据且总分合理，使用计算出的总分；否则使用AI给出的总分
         if score_details and calculated_total > 0:
             final_total_score = round(calculated_total, 1)
-            logger.info("使用评分细则计算总分: AI总分={}, 细则总分={}, 最终总分={}".format(
-                total_score, calculated_total, final_total_score))
+            logger.info("使用评分细则计算总分: AI总分=%s, 细则总分=%s, 最终总分=%s",
+                        total_score, calculated_total, final_total_score)
             
             # 记录分数差异用于监控
             score_difference = abs(total_score - calculated_total)
             if score_difference > 5:
-                logger.warning("总分差异较大: AI总分={}, 细则总分={}, 差异={}".format(
-                    total_score, calculated_total, score_difference))
+                logger.warning("总分差异较大: AI总分=%s, 细则总分=%s, 差异=%s",
+                               total_score, calculated_total, score_difference)
         else:
             final_total_score = total_score
-            logger.info("使用AI总分: {} (评分细则数据不足)".format(final_total_score))
+            logger.info("使用AI总分: %s (评分细则数据不足)", final_total_score)
         
         return EssayGradingResult(
             score=final_total_score,  # 使用计算后的一致总分
@@ -436,13 +522,14 @@ def parse_ai_json_response(ai_response: str, stage_name: str, question_type: str
     """直接解析AI返回的JSON响应，如果失败则抛出异常"""
     try:
         # 记录AI响应
-        logger.info("{}收到AI响应，长度: {}".format(stage_name, len(ai_response)))
-        logger.info("{}AI响应前200字符: {}".format(stage_name, ai_response[:200]))
+        if logger.isEnabledFor(logging.INFO):
+            logger.info("%s收到AI响应，长度: %s", stage_name, len(ai_response))
+            logger.info("%sAI响应前200字符: %s", stage_name, ai_response[:200])
         
         # 尝试解析JSON响应
         result_data = try_parse_json_response(ai_response, stage_name)
         if result_data:
-            logger.info("{}JSON解析成功".format(stage_name))
+            logger.info("%sJSON解析成功", stage_name)
             return result_data
         
         # JSON解析失败，抛出异常
@@ -467,10 +554,10 @@ def try_parse_json_response(ai_response: str, stage_name: str) -> dict:
         
         # 方法1: 直接解析
         try:
-            result = json.loads(cleaned_response)
-            logger.info("{}直接JSON解析成功".format(stage_name))
+            result = orjson.loads(cleaned_response)
+            logger.info("%s直接JSON解析成功", stage_name)
             return result
-        except json.JSONDecodeError:
+        except orjson.JSONDecodeError:
             pass
         
         # 方法2: 查找JSON结构
@@ -486,10 +573,10 @@ def try_parse_json_response(ai_response: str, stage_name: str) -> dict:
             json_str = re.sub(r',\s*]', ']', json_str)
             
             try:
-                result = json.loads(json_str)
-                logger.info("{}结构化JSON解析成功".format(stage_name))
+                result = orjson.loads(json_str)
+                logger.info("%s结构化JSON解析成功", stage_name)
                 return result
-            except json.JSONDecodeError:
+            except orjson.JSONDecodeError:
                 pass
         
         # 方法3: 多个JSON对象的情况
@@ -497,10 +584,10 @@ def try_parse_json_response(ai_response: str, stage_name: str) -> dict:
         if json_objects:
             for json_obj in json_objects:
                 try:
-                    result = json.loads(json_obj)
-                    logger.info("{}多对象JSON解析成功".format(stage_name))
+                    result = orjson.loads(json_obj)
+                    logger.info("%s多对象JSON解析成功", stage_name)
                     return result
-                except json.JSONDecodeError:
+                except orjson.JSONDecodeError:
                     continue
         
         logger.warning("{}所有JSON解析方法都失败".format(stage_name))
@@ -571,13 +658,7 @@ def convert_diagnosis_to_score_details(diagnosis_data: dict, question_type: str
 async def get_question_type_from_ai(question_text: str) -> str:
     """AI题型诊断服务 - 增强版本，基于申论四大题型核心秘籍"""
     try:
-        client = AsyncOpenAI(
-            api_key=settings.openai_api_key,
-            base_url=settings.openai_api_base,
-            default_headers={
-                "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-            }
-        )
+        client = await get_openai_client()
         
         # 为避免偏置，仅使用中立定义进行识别
         prompt = """你是申论题型专家"悟道"，基于《申论四大题型核心秘籍》进行题型识别。
@@ -648,7 +729,7 @@ async def get_question_type_from_ai(question_text: str) -> str:
         # 优先精确匹配
         for valid_type in valid_types:
             if valid_type == question_type:
-                logger.info("AI题型诊断结果（精确匹配）: {}".format(valid_type))
+                logger.info("AI题型诊断结果（精确匹配）: %s", valid_type)
                 ai_type = valid_type
                 break
         else:
@@ -657,7 +738,7 @@ async def get_question_type_from_ai(question_text: str) -> str:
         # 如果没有精确匹配，进行包含匹配
         for valid_type in valid_types:
             if valid_type in question_type:
-                logger.info("AI题型诊断结果（包含匹配）: {}".format(valid_type))
+                logger.info("AI题型诊断结果（包含匹配）: %s", valid_type)
                 ai_type = valid_type
                 break
         
@@ -692,7 +773,7 @@ async def get_question_type_from_ai(question_text: str) -> str:
         heuristic_type = None  # 初始化变量
         if has_comprehensive_keywords or has_multi_layer_requirements:
             heuristic_type = "综合分析题"
-            logger.info(f"启发式识别为综合分析题，关键词匹配: {has_comprehensive_keywords}, 多层次要求: {has_multi_layer_requirements}")
+            logger.info("启发式识别为综合分析题，关键词匹配: %s, 多层次要求: %s", has_comprehensive_keywords, has_multi_layer_requirements)
         elif any(keyword in question_text_lower for keyword in summary_keywords) and not has_comprehensive_keywords:
             # 只有在没有分析类词汇的情况下才判断为概括题
             heuristic_type = "概括题"
@@ -701,7 +782,7 @@ async def get_question_type_from_ai(question_text: str) -> str:
         elif any(keyword in question_text_lower for keyword in application_keywords):
             heuristic_type = "应用文写作题"
         
-        logger.info(f"启发式识别结果: {heuristic_type}")
+        logger.info("启发式识别结果: %s", heuristic_type)
         
         # 决策：若 AI 判为概括题，但启发式强烈指向综合分析题，则以启发式为准
         if ai_type:
@@ -1,8 +1,12 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 
+import copy
+import threading
+import time
 import uuid
-from typing import Any, Dict, List, Optional
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional
 from app.db.database import SessionLocal
 from app.models.history import History
 
@@ -10,6 +14,49 @@ from app.models.history import History
 """Database-backed history service (strict: no filesystem fallback)."""
 
 
+class _TTLCache:
+    """Small thread-safe LRU with per-entry TTL, used to absorb frontend polling.
+
+    Values are deep-copied on the way in and out so callers can mutate results freely.
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Any:
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+        return copy.deepcopy(value)
+
+    def set(self, key: Hashable, value: Any) -> None:
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._data[key] = (time.monotonic() + self.ttl, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+
+_INSERT_STMT = History.__table__.insert()
+
+_list_cache = _TTLCache(maxsize=256, ttl=5)
+_item_cache = _TTLCache(maxsize=1024, ttl=5)
+
+
 def append_history(
     *,
     kind: str,
@@ -24,17 +71,21 @@ def append_history(
     """
     record_id = str(uuid.uuid4())
     with SessionLocal() as db:
-        row = History(
-            id=record_id,
-            kind=kind,
-            question_type=(response.get("questionType") or request.get("question_type")),
-            score=response.get("score"),
-            request_json=request,
-            response_json=response,
-            extra_json=extra,
+        # Write-only audit row: Core insert skips ORM unit-of-work bookkeeping
+        db.execute(
+            _INSERT_STMT,
+            {
+                "id": record_id,
+                "kind": kind,
+                "question_type": (response.get("questionType") or request.get("question_type")),
+                "score": response.get("score"),
+                "request_json": request,
+                "response_json": response,
+                "extra_json": extra,
+            },
         )
-        db.add(row)
         db.commit()
+        _list_cache.clear()
         return record_id
 
     return record_id
@@ -43,6 +94,9 @@ def append_history(
 def list_history(limit: int = 20) -> List[Dict[str, Any]]:
     """Return last N history entries (most recent first). DB only."""
     limit = max(1, min(int(limit or 20), 200))
+    cached = _list_cache.get(limit)
+    if cached is not None:
+        return cached
     with SessionLocal() as db:
         rows = (
             db.query(History)
@@ -50,7 +104,7 @@ def list_history(limit: int = 20) -> List[Dict[str, Any]]:
             .limit(limit)
             .all()
         )
-        return [
+        items = [
             {
                 "id": r.id,
                 "timestamp": r.created_at.isoformat() if r.created_at else None,
@@ -60,13 +114,18 @@ def list_history(limit: int = 20) -> List[Dict[str, Any]]:
             }
             for r in rows
         ]
+        _list_cache.set(limit, items)
+        return items
 
 
 def get_history_item(item_id: str) -> Optional[Dict[str, Any]]:
+    cached = _item_cache.get(item_id)
+    if cached is not None:
+        return cached
     with SessionLocal() as db:
         r = db.query(History).filter(History.id == item_id).first()
         if r:
-            return {
+            item = {
                 "id": r.id,
                 "timestamp": r.created_at.isoformat() if r.created_at else None,
                 "type": r.kind,
@@ -74,6 +133,8 @@ def get_history_item(item_id: str) -> Optional[Dict[str, Any]]:
                 "response": r.response_json,
                 "extra": r.extra_json,
             }
+            _item_cache.set(item_id, item)
+            return item
         return None
 
 
@@ -83,4 +144,6 @@ def clear_history() -> int:
         count = db.query(History).count()
         db.query(History).delete()
         db.commit()
+        _list_cache.clear()
+        _item_cache.clear()
         return int(count)
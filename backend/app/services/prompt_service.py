@@ -152,36 +152,17 @@ ESSAY_GRADING_MANUAL = """《申论四大题型核心秘籍》
 应用文的精髓在于：情境为王，格式为骨，内容为肉，语言为魂。"""
 
 
-def extract_chapter_content(question_type: str) -> str:
-    """
-    知识提取服务 (Knowledge Extractor)
-    根据题型从核心秘籍中精准提取对应章节的全部内容
-    
-    Args:
-        question_type: 题型名称（概括题、综合分析题、对策题、应用文写作题）
-        
-    Returns:
-        str: 对应章节的完整内容，如果题型无效则返回空字符串
-    """
-    
-    # 定义各题型对应的章节标识
-    chapter_markers = {
-        "概括题": ("第一章：概括题——信息降维与逻辑重建的艺术", "第二章：综合分析题"),
-        "综合分析题": ("第二章：综合分析题——解构与重构的逻辑思辨", "第三章：对策题"),
-        "对策题": ("第三章：对策题——对症下药的精准施策", "第四章：应用文写作题"),
-        "应用文写作题": ("第四章：应用文写作题——带着镣铐的场景之舞", None)  # 最后一章到文档末尾
-    }
-    
-    if question_type not in chapter_markers:
-        # 记录警告但不抛出异常，返回空内容
-        import logging
-        logger = logging.getLogger(__name__)
-        logger.warning(f"不支持的题型: {question_type}, 支持的题型: {list(chapter_markers.keys())}")
-        return ""
-    
-    start_marker, end_marker = chapter_markers[question_type]
-    
-    # 找到章节开始位置
+# 定义各题型对应的章节标识
+_CHAPTER_MARKERS = {
+    "概括题": ("第一章：概括题——信息降维与逻辑重建的艺术", "第二章：综合分析题"),
+    "综合分析题": ("第二章：综合分析题——解构与重构的逻辑思辨", "第三章：对策题"),
+    "对策题": ("第三章：对策题——对症下药的精准施策", "第四章：应用文写作题"),
+    "应用文写作题": ("第四章：应用文写作题——带着镣铐的场景之舞", None)  # 最后一章到文档末尾
+}
+
+
+def _slice_chapter(start_marker: str, end_marker) -> str:
+    """从核心秘籍中按起止标记切出章节内容，未找到起始标记返回空字符串"""
     start_pos = ESSAY_GRADING_MANUAL.find(start_marker)
     if start_pos == -1:
         import logging
@@ -201,12 +182,45 @@ def extract_chapter_content(question_type: str) -> str:
         else:
             chapter_content = ESSAY_GRADING_MANUAL[start_pos:end_pos]
     
+    return chapter_content.strip()
+
+
+# 秘籍为静态内容：章节在模块加载时切分一次，之后直接查表
+# 注意：秘籍保持str而非UTF-8 bytes——中文在str中按每字符2字节存储，UTF-8需3字节，
+# bytes反而更占内存；且prompt以str拼接，存bytes意味着每次调用都要重新解码
+_CHAPTERS = {
+    question_type: _slice_chapter(start_marker, end_marker)
+    for question_type, (start_marker, end_marker) in _CHAPTER_MARKERS.items()
+}
+
+
+def extract_chapter_content(question_type: str) -> str:
+    """
+    知识提取服务 (Knowledge Extractor)
+    根据题型从核心秘籍中精准提取对应章节的全部内容
+    
+    Args:
+        question_type: 题型名称（概括题、综合分析题、对策题、应用文写作题）
+        
+    Returns:
+        str: 对应章节的完整内容，如果题型无效则返回空字符串
+    """
+    
+    if question_type not in _CHAPTERS:
+        # 记录警告但不抛出异常，返回空内容
+        import logging
+        logger = logging.getLogger(__name__)
+        logger.warning(f"不支持的题型: {question_type}, 支持的题型: {list(_CHAPTER_MARKERS.keys())}")
+        return ""
+    
+    chapter_content = _CHAPTERS[question_type]
+    
     # 记录提取结果
     import logging
     logger = logging.getLogger(__name__)
     logger.info(f"成功提取 {question_type} 章节内容，长度: {len(chapter_content)} 字符")
     
-    return chapter_content.strip()
+    return chapter_content
 
 
 def create_master_grading_prompt(essay_content: str, question_type: str, chapter_content: str) -> str:
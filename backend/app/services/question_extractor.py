@@ -8,32 +8,119 @@
 
 from docx import Document
 from docx.oxml.ns import nsmap
+from lxml import etree
 import re
 import os
+import hashlib
 import uuid
-from typing import List, Dict, Any, Optional, Tuple
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Optional, Tuple, NamedTuple
 from PIL import Image
 import io
 import logging
 
 logger = logging.getLogger(__name__)
 
+# 预编译正则：避免在逐段落循环中重复编译/查缓存
+_SECTION_RE = re.compile(r'^[一二三四五六]、')
+_QUESTION_NUM_RE = re.compile(r'^\d+$')
+_DATASET_RE = re.compile(r'^（[一二三四五六七八九十]+）$')
+# 选项识别：A/B/C/D + 可选空白 + 标点（全角/半角）；用集合判断代替正则匹配
+_OPTION_FIRST = frozenset('ABCDＡＢＣＤ')
+_OPTION_PUNCT = frozenset('、.．)')
+
+
+def _is_option(text: str) -> bool:
+    """等价于 re.match(r'^[A-DＡ-Ｄ][\s\t]*[、\.．\)]', text)"""
+    return bool(text) and text[0] in _OPTION_FIRST and text[1:].lstrip()[:1] in _OPTION_PUNCT
+
+_NS = {
+    'w': 'http://schemas.openxmlformats.org/wordprocessingml/2006/main',
+    'pic': 'http://schemas.openxmlformats.org/drawingml/2006/picture',
+    'v': 'urn:schemas-microsoft-com:vml',
+}
+# 元素（段落或 run）内是否包含图片：直接在lxml树上判断，避免把元素序列化成XML字符串再做子串匹配
+_HAS_IMAGE = etree.XPath(
+    'boolean(.//w:drawing | .//pic:pic | .//v:imagedata)', namespaces=_NS
+)
+# 段落直接 run 下的文本节点（按文档顺序），与 python-docx Run.text 识别的元素一致
+_RUN_TEXT_NODES = etree.XPath('w:r/w:t | w:r/w:tab | w:r/w:br | w:r/w:cr', namespaces=_NS)
+# 段落内全部图片关系ID；用 local-name() 匹配，兼容命名空间前缀不一致的文档
+_EMBED_XPATH = etree.XPath(
+    ".//*[local-name()='blip']/@*[local-name()='embed']"
+    " | .//*[local-name()='imagedata']/@*[local-name()='id']"
+)
+
+# 流式解析 document.xml 用到的 Clark 标签
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_W_BODY = f'{_W}body'
+_W_P = f'{_W}p'
+_W_R = f'{_W}r'
+_W_T = f'{_W}t'
+_W_TAB = f'{_W}tab'
+_OFFICE_DOCUMENT_REL = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument'
+
+# 部件名无扩展名时按内容类型推断图片扩展名
+_CT_TO_EXT = {
+    'image/jpeg': '.jpg',
+    'image/png': '.png',
+    'image/gif': '.gif',
+    'image/bmp': '.bmp',
+    'image/tiff': '.tiff',
+    'image/x-emf': '.emf',
+    'image/x-wmf': '.wmf',
+}
+
+
+def _paragraph_text(p) -> str:
+    """等价于 Paragraph.text：一次XPath取出文本节点后拼接，不再为每个 run 构造 Run 对象并逐段累加字符串"""
+    return ''.join(
+        (node.text or '') if node.tag == _W_T else ('\t' if node.tag == _W_TAB else '\n')
+        for node in _RUN_TEXT_NODES(p)
+    )
+
+
+def _shard_path(filename: str) -> str:
+    """按文件名哈希取两级分片目录（ab/cd/文件名），避免单个图片目录条目过多导致创建/删除变慢"""
+    h = hashlib.blake2b(filename.encode('utf-8'), digest_size=2).hexdigest()
+    return f"{h[:2]}/{h[2:4]}/{filename}"
+
+
+class _StreamedParagraph(NamedTuple):
+    """流式扫描得到的正文段落：text 等同 Paragraph.text.strip()（只计算一次），image_runs 为含图片的 run 数"""
+    text: str
+    image_runs: int
+
+
+def _main_document_member(zf: zipfile.ZipFile) -> str:
+    """从包关系中定位主文档部件（通常为 word/document.xml）"""
+    try:
+        rels = etree.fromstring(zf.read('_rels/.rels'))
+        for rel in rels:
+            if rel.get('Type') == _OFFICE_DOCUMENT_REL:
+                return rel.get('Target', '').lstrip('/')
+    except KeyError:
+        pass
+    return 'word/document.xml'
+
 
 class HumanLogicQuestionExtractor:
     """基于人类逻辑的题目提取器"""
     
     def __init__(self):
-        self.section_pattern = r'^[一二三四五六]、'
-        self.question_pattern = r'^\d+$'
+        self.section_pattern = _SECTION_RE
+        self.question_pattern = _QUESTION_NUM_RE
         
     def extract_questions(self, docx_path: str) -> Dict[str, Any]:
         """主提取函数"""
         try:
-            doc = Document(docx_path)
             logger.info(f"开始提取题目，文档路径: {docx_path}")
+            # 题目切分只需要段落文本和图片数，流式扫描即可，无需构建完整的 Document
+            paragraphs = self._stream_extract(docx_path)
             
             # 第1步：找到所有题型分界点
-            sections = self.find_sections(doc)
+            sections = self.find_sections(paragraphs)
             logger.info(f"找到 {len(sections)} 个题型")
             
             # 第2步：在每个题型内找题目
@@ -41,13 +128,15 @@ class HumanLogicQuestionExtractor:
             total_images = 0
             
             for section in sections:
-                section['questions'] = self.find_questions_in_section(doc, section)
+                section['questions'] = self.find_questions_in_section(paragraphs, section)
                 logger.info(f"{section['name']}: {len(section['questions'])}道题")
                 total_questions += len(section['questions'])
             
             # 第3步：提取每道题的完整内容（按数据集分组合并材料）
             all_questions = []
-            for section in sections:
+            # 各题型的原始图片数，供结果摘要直接使用，避免再次提取题目内容
+            section_image_totals = [0] * len(sections)
+            for section_idx, section in enumerate(sections):
                 section_questions = section['questions']
 
                 # 计算每个组（（一）（二）（三）…）的材料前言，仅在组内共享
@@ -63,14 +152,14 @@ class HumanLogicQuestionExtractor:
                         first_q = min(qs, key=lambda x: x.get('number_index', x['start']))
                         number_index = first_q.get('number_index', first_q['start'])
                         if first_q['start'] < number_index:
-                            preface_by_group[gid] = self.extract_question_content(doc, {
+                            preface_by_group[gid] = self.extract_question_content(paragraphs, {
                                 'start': first_q['start'],
                                 'end': number_index
                             })
                         first_num_idx_by_group[gid] = number_index
 
                 for question in section_questions:
-                    raw_content = self.extract_question_content(doc, question)
+                    raw_content = self.extract_question_content(paragraphs, question)
                     content = raw_content
                     gid = question.get('group_id', 0)
                     first_idx = first_num_idx_by_group.get(gid)
@@ -95,6 +184,7 @@ class HumanLogicQuestionExtractor:
                     all_questions.append(question_data)
                     # 注意：此处累计的是原始题目图片数，用于整体校验；不重复累计组前言
                     total_images += raw_content.get('total_images', 0)
+                    section_image_totals[section_idx] += raw_content.get('total_images', 0)
             
             # 验证结果
             validation = self.validate_extraction_results(all_questions, total_questions, total_images)
@@ -107,8 +197,8 @@ class HumanLogicQuestionExtractor:
                     'name': s['name'],
                     'count': len(s['questions']),
                     'questions': [q['number'] for q in s['questions']],
-                    'total_images': sum(self.extract_question_content(doc, q).get('total_images', 0) for q in s['questions'])
-                } for s in sections},
+                    'total_images': section_image_totals[i]
+                } for i, s in enumerate(sections)},
                 'questions': all_questions,
                 'validation': validation
             }
@@ -125,12 +215,33 @@ class HumanLogicQuestionExtractor:
                 'validation': {'issues': [f'提取过程错误: {str(e)}']}
             }
     
-    def find_sections(self, doc: Document) -> List[Dict[str, Any]]:
+    def _stream_extract(self, docx_path: str) -> List[_StreamedParagraph]:
+        """用 iterparse 流式扫描主文档，按 doc.paragraphs 的顺序返回正文段落摘要"""
+        paragraphs: List[_StreamedParagraph] = []
+        with zipfile.ZipFile(docx_path) as zf:
+            with zf.open(_main_document_member(zf)) as source:
+                for _, elem in etree.iterparse(source, events=('end',), tag=_W_P, huge_tree=True):
+                    body = elem.getparent()
+                    # 表格、文本框中的段落不属于 doc.paragraphs，留给外层元素一并释放
+                    if body is None or body.tag != _W_BODY:
+                        continue
+                    # 绝大多数段落是纯文本：先整段判断一次，有图才逐个检查直接 w:r 子元素（与 python-docx 一致）
+                    image_runs = 0
+                    if _HAS_IMAGE(elem):
+                        image_runs = sum(1 for run in elem.iterchildren(_W_R) if _HAS_IMAGE(run))
+                    paragraphs.append(_StreamedParagraph(_paragraph_text(elem).strip(), image_runs))
+                    # 释放已处理的段落及之前的兄弟节点（含已结束的表格），保持内存占用平稳
+                    elem.clear()
+                    while elem.getprevious() is not None:
+                        del body[0]
+        return paragraphs
+
+    def find_sections(self, paragraphs: List[_StreamedParagraph]) -> List[Dict[str, Any]]:
         """找题型边界"""
         sections = []
-        for i, para in enumerate(doc.paragraphs):
-            text = para.text.strip()
-            if re.match(self.section_pattern, text):
+        for i, para in enumerate(paragraphs):
+            text = para.text
+            if self.section_pattern.match(text):
                 sections.append({
                     'name': text,
                     'start_para': i
@@ -141,27 +252,26 @@ class HumanLogicQuestionExtractor:
             if i + 1 < len(sections):
                 sections[i]['end_para'] = sections[i + 1]['start_para']
             else:
-                sections[i]['end_para'] = len(doc.paragraphs)
+                sections[i]['end_para'] = len(paragraphs)
         
         return sections
     
-    def find_questions_in_section(self, doc: Document, section: Dict[str, Any]) -> List[Dict[str, Any]]:
+    def find_questions_in_section(self, paragraphs: List[_StreamedParagraph], section: Dict[str, Any]) -> List[Dict[str, Any]]:
         """提取章节内部的题目编号范围"""
         questions: List[Dict[str, Any]] = []
         current_start = section['start_para']
         last_boundary = section['start_para']
-        dataset_heading_pattern = re.compile(r'^（[一二三四五六七八九十]+）$')
         in_preface = False
         # 分组ID：遇到（（一）（二）（三）…）时递增，用于资料分析等大题分组
         group_id = 0
         current_group_start = section['start_para']
 
         for i in range(section['start_para'], section['end_para']):
-            if i >= len(doc.paragraphs):
+            if i >= len(paragraphs):
                 break
-            text = doc.paragraphs[i].text.strip()
+            text = paragraphs[i].text
 
-            if dataset_heading_pattern.match(text):
+            if _DATASET_RE.match(text):
                 if questions:
                     questions[-1]['end'] = last_boundary
                 current_start = i
@@ -172,7 +282,7 @@ class HumanLogicQuestionExtractor:
                 current_group_start = i
                 continue
 
-            if re.match(self.question_pattern, text):
+            if self.question_pattern.match(text):
                 if questions:
                     # 结束上一题到当前数字标题前的最后一行
                     questions[-1]['end'] = last_boundary
@@ -197,29 +307,21 @@ class HumanLogicQuestionExtractor:
 
         return questions
 
-    def extract_question_content(self, doc: Document, question: Dict[str, Any]) -> Dict[str, Any]:
+    def extract_question_content(self, paragraphs: List[_StreamedParagraph], question: Dict[str, Any]) -> Dict[str, Any]:
         """提取题目的完整内容"""
         content = []
         total_images = 0
         total_text_length = 0
-        # 选项识别：A/B/C/D + 标点（全角/半角）
-        option_pattern = re.compile(r'^[A-DＡ-Ｄ][\s\t]*[、\.．\)]')
-        
+
         for para_idx in range(question['start'], question['end']):
-            if para_idx < len(doc.paragraphs):
-                para = doc.paragraphs[para_idx]
-                para_text = para.text.strip()
+            if para_idx < len(paragraphs):
+                para = paragraphs[para_idx]
+                para_text = para.text
                 
-                # 统计图片（简化方法）
-                para_images = 0
-                for run in para.runs:
-                    if hasattr(run._element, 'xml'):
-                        xml_str = str(run._element.xml)
-                        if '<w:drawing' in xml_str or '<pic:pic' in xml_str or '<v:imagedata' in xml_str:
-                            para_images += 1
+                para_images = para.image_runs
                 
                 # 选项段落的图片不计入题目材料图片总数
-                if not option_pattern.match(para_text):
+                if not _is_option(para_text):
                     total_images += para_images
                 total_text_length += len(para_text)
                 
@@ -247,12 +349,25 @@ class HumanLogicQuestionExtractor:
             issues.append(f"题目数量异常: 预期135道，实际{total_questions}道")
         
         # 验证题目编号连续性
-        numbers = [q['number'] for q in questions]
-        numbers.sort()
-        for i in range(1, len(numbers)):
-            if numbers[i] != numbers[i-1] + 1:
-                issues.append(f"题目编号不连续: {numbers[i-1]} -> {numbers[i]}")
-                break
+        # 单次遍历收集编号集合与最小重复编号，无需构建列表再排序
+        seen = set()
+        first_dup = None
+        for q in questions:
+            n = q['number']
+            if n in seen:
+                if first_dup is None or n < first_dup:
+                    first_dup = n
+            else:
+                seen.add(n)
+        if seen:
+            lo, hi = min(seen), max(seen)
+            missing = next((i for i in range(lo, hi + 1) if i not in seen), None)
+            # 按排序后的顺序报告第一处不连续：重复编号 d 在缺号之前时报告 d -> d
+            if first_dup is not None and (missing is None or first_dup < missing):
+                issues.append(f"题目编号不连续: {first_dup} -> {first_dup}")
+            elif missing is not None:
+                after = next(i for i in range(missing + 1, hi + 1) if i in seen)
+                issues.append(f"题目编号不连续: {missing - 1} -> {after}")
         
         # 验证图片数量
         if total_images < 3000:
@@ -272,11 +387,38 @@ class QuestionImageExtractor:
     def __init__(self, output_dir: str = "images") -> None:
         self.output_dir = output_dir
         os.makedirs(output_dir, exist_ok=True)
+        # 文档级索引（段落列表、段落文本、关系 rel_id -> (part, 扩展名)），同一文档的多道题共用
+        self._indexed_doc: Optional[Document] = None
+        self._paragraphs: List[Any] = []
+        self._texts: List[str] = []
+        self._rel_parts: Dict[str, Tuple[Any, str]] = {}
+        # 已写盘的图片 rel_id -> 文件名；资料分析等组内多题共用材料图时直接复用，不重复写盘
+        self._rel_to_filename: Dict[str, str] = {}
+        # 已创建的分片目录，每个目录只 mkdir 一次
+        self._shard_dirs: set = set()
+
+    def _index_document(self, doc: Document) -> None:
+        """按文档构建一次索引：doc.paragraphs 每次访问都会重新遍历XML，related_parts 也无需每张图重算"""
+        if self._indexed_doc is not doc:
+            self._paragraphs = list(doc.paragraphs)
+            self._texts = [_paragraph_text(p._element).strip() for p in self._paragraphs]
+            index: Dict[str, Tuple[Any, str]] = {}
+            for rel_id, part in doc.part.related_parts.items():
+                partname = str(getattr(part, 'partname', ''))
+                ext = os.path.splitext(partname)[1].lower()
+                if not ext:
+                    ext = _CT_TO_EXT.get(getattr(part, 'content_type', '').lower(), '')
+                index[rel_id] = (part, ext)
+            self._indexed_doc = doc
+            self._rel_parts = index
+            self._rel_to_filename = {}
 
     def extract_images_from_question(self, doc: Document, question_data: Dict[str, Any], question_id: str) -> List[Dict[str, Any]]:
         """从题目内容中提取图片并保存到输出目录"""
         images: List[Dict[str, Any]] = []
         question_number = question_data.get('number', 0)
+        self._index_document(doc)
+        paragraphs, texts, rel_parts = self._paragraphs, self._texts, self._rel_parts
 
         paragraph_range = question_data.get('paragraph_range', '0-0')
         content_paras = question_data.get('content', {}).get('paragraphs', [])
@@ -286,19 +428,20 @@ class QuestionImageExtractor:
             try:
                 start_para, end_para = map(int, paragraph_range.split('-'))
             except ValueError:
-                start_para, end_para = 0, len(doc.paragraphs)
-            paragraph_indices = list(range(start_para, min(end_para, len(doc.paragraphs))))
+                start_para, end_para = 0, len(paragraphs)
+            paragraph_indices = list(range(start_para, min(end_para, len(paragraphs))))
 
+        # 待写入的 (图片字节, 文件路径, 图片信息)，段落扫描结束后批量写盘；复用已有文件时图片字节为 None
+        pending: List[Tuple[Optional[bytes], str, Dict[str, Any]]] = []
         image_index = 0
-        # 选项识别：A/B/C/D + 标点（包含全角/半角）。仅当前面出现过题号后才生效
-        option_pattern = re.compile(r'^[A-DＡ-Ｄ][\s\t]*[、\.．\)]')
+        # 选项识别仅当前面出现过题号后才生效
         seen_question_number = False
 
         for para_idx in paragraph_indices:
-            if not (0 <= para_idx < len(doc.paragraphs)):
+            if not (0 <= para_idx < len(paragraphs)):
                 continue
-            para = doc.paragraphs[para_idx]
-            para_text = para.text.strip()
+            para = paragraphs[para_idx]
+            para_text = texts[para_idx]
             # 在遇到题号所在段之后，再识别选项段落；避免把材料中带A/B/C标注误判为选项
             if not seen_question_number:
                 number_idx = question_data.get('number_index')
@@ -308,157 +451,76 @@ class QuestionImageExtractor:
                 else:
                     # 若缺少题号索引则默认首段之后均视为选项
                     seen_question_number = True
-            is_option_para = bool(option_pattern.match(para_text)) and seen_question_number
+            is_option_para = _is_option(para_text) and seen_question_number
 
-            # 先从 run 中提取
             seen_hashes: set = set()
-            def _emit(img_bytes: bytes, ext: str):
+            def _emit(img_bytes: bytes, ext: str, rel_id: str):
                 nonlocal image_index
-                # 去重：按前16字节做简单哈希
-                h = img_bytes[:16]
+                # 去重：按内容哈希（仅比前16字节会把同格式文件头的不同图片误判为重复）
+                h = hashlib.blake2b(img_bytes, digest_size=16).digest()
                 if h in seen_hashes:
                     return
                 seen_hashes.add(h)
-                file_extension = ext if ext else '.png'
-                if not file_extension.startswith('.'):
-                    file_extension = f'.{file_extension}'
-                filename = f"question_{question_number}_{image_index}_{uuid.uuid4().hex[:8]}{file_extension}"
+                filename = self._rel_to_filename.get(rel_id)
+                if filename is None:
+                    file_extension = ext if ext else '.png'
+                    if not file_extension.startswith('.'):
+                        file_extension = f'.{file_extension}'
+                    # 存储的相对路径带分片目录（ab/cd/文件名）
+                    filename = _shard_path(f"question_{question_number}_{image_index}_{uuid.uuid4().hex[:8]}{file_extension}")
+                    shard_dir = os.path.join(self.output_dir, os.path.dirname(filename))
+                    if shard_dir not in self._shard_dirs:
+                        os.makedirs(shard_dir, exist_ok=True)
+                        self._shard_dirs.add(shard_dir)
+                    self._rel_to_filename[rel_id] = filename
+                else:
+                    img_bytes = None
                 filepath = os.path.join(self.output_dir, filename)
-                if self.save_image_data(img_bytes, filepath):
-                    images.append({
-                        'filename': filename,
-                        'context_text': para_text[:100],
-                        'paragraph_index': para_idx,
-                        'position_in_question': image_index,
-                        'image_type': 'option' if is_option_para else 'material'
-                    })
-                    image_index += 1
-
-            for run in para.runs:
-                image_payload = self.extract_image_from_run(run, doc)
-                if image_payload:
-                    _emit(image_payload[0], image_payload[1])
-
-            # 兜底：直接扫描段落XML，提取 r:embed / r:id 并从文档关系取图
+                pending.append((img_bytes, filepath, {
+                    'filename': filename,
+                    'context_text': para_text[:100],
+                    'paragraph_index': para_idx,
+                    'image_type': 'option' if is_option_para else 'material'
+                }))
+                image_index += 1
+
+            # 一次XPath取出本段所有图片关系ID（a:blip/@r:embed、v:imagedata/@r:id），按文档顺序
             try:
-                import re as _re
-                para_xml = str(getattr(para._element, 'xml', ''))
-                rel_ids = _re.findall(r'(?:r:embed|r:id)="([^"]+)"', para_xml)
-                for rel_id in rel_ids:
-                    part = None
-                    try:
-                        part = doc.part.related_parts.get(rel_id)
-                    except Exception:
-                        part = None
-                    if part is None:
+                for rel_id in _EMBED_XPATH(para._element):
+                    entry = rel_parts.get(rel_id)
+                    if entry is None:
                         continue
+                    part, ext = entry
                     img_bytes = getattr(part, 'blob', None) or getattr(part, '_blob', None)
                     if not img_bytes:
                         continue
-                    partname = str(getattr(part, 'partname', ''))
-                    ext = os.path.splitext(partname)[1].lower()
-                    if not ext:
-                        content_type = getattr(part, 'content_type', '')
-                        ext = self._extension_from_content_type(content_type)
-                    _emit(img_bytes, ext)
-            except Exception:
-                pass
+                    _emit(img_bytes, ext, rel_id)
+            except Exception as exc:
+                logger.warning(f"提取图片失败: {exc}")
+
+        # 并发写盘（落盘受文件系统延迟主导，用线程池重叠写入；线程池随本次写入结束而关闭）
+        # 仅保留写入成功的图片，位置序号按成功顺序重新编排
+        writes = [(data, path) for data, path, _ in pending if data is not None]
+        failed = set()
+        if writes:
+            with ThreadPoolExecutor(max_workers=min(len(writes), (os.cpu_count() or 1) * 2)) as executor:
+                saved = list(executor.map(lambda w: self.save_image_data(w[0], w[1]), writes))
+            failed = {path for (_, path), ok in zip(writes, saved) if not ok}
+        if failed:
+            self._rel_to_filename = {
+                rel_id: filename for rel_id, filename in self._rel_to_filename.items()
+                if os.path.join(self.output_dir, filename) not in failed
+            }
+        for _, path, info in pending:
+            if path not in failed:
+                info['position_in_question'] = len(images)
+                images.append(info)
 
         return images
 
-    def extract_image_from_run(self, run, doc: Document) -> Optional[Tuple[bytes, str]]:
-        """从 run 元素获取图片的原始数据和扩展名"""
-        try:
-            element = run._element
-
-            # 优先使用命名空间方式读取关系ID
-            ns = {
-                'a': 'http://schemas.openxmlformats.org/drawingml/2006/main',
-                'r': 'http://schemas.openxmlformats.org/officeDocument/2006/relationships',
-                'v': 'urn:schemas-microsoft-com:vml',
-                'o': 'urn:schemas-microsoft-com:office:office',
-                'wp': 'http://schemas.openxmlformats.org/drawingml/2006/wordprocessingDrawing',
-                'w': 'http://schemas.openxmlformats.org/wordprocessingml/2006/main',
-                'pic': 'http://schemas.openxmlformats.org/drawingml/2006/picture',
-            }
-            embed_ids = []
-            try:
-                embed_ids = element.xpath('.//a:blip/@r:embed', namespaces=ns)
-            except Exception:
-                embed_ids = []
-            if not embed_ids:
-                try:
-                    embed_ids = element.xpath('.//v:imagedata/@r:id', namespaces=ns)
-                except Exception:
-                    embed_ids = []
-            # 兜底：使用 local-name() 匹配，防止命名空间不一致
-            if not embed_ids:
-                embed_ids = element.xpath(".//*[local-name()='blip']/@*[local-name()='embed']")
-            if not embed_ids:
-                embed_ids = element.xpath(".//*[local-name()='imagedata']/@*[local-name()='id']")
-            # 终极兜底：直接在XML字符串里用正则找 r:embed / r:id
-            if not embed_ids:
-                try:
-                    import re as _re
-                    xml_str = str(getattr(element, 'xml', ''))
-                    m = _re.findall(r'(?:r:embed|r:id)="([^"]+)"', xml_str)
-                    if m:
-                        embed_ids = m
-                except Exception:
-                    pass
-            if not embed_ids:
-                return None
-
-            rel_id = embed_ids[0]
-            image_part = None
-            # 优先从当前 run 所属 part 获取
-            try:
-                image_part = run.part.related_parts.get(rel_id)
-            except Exception:
-                image_part = None
-            # 兜底：从整个文档 part 关系里找
-            if image_part is None:
-                try:
-                    image_part = doc.part.related_parts.get(rel_id)
-                except Exception:
-                    image_part = None
-            if image_part is None:
-                return None
-
-            # 兼容不同实现的属性名
-            image_bytes = getattr(image_part, 'blob', None)
-            if image_bytes is None:
-                image_bytes = getattr(image_part, '_blob', None)
-            if image_bytes is None:
-                return None
-            partname = str(getattr(image_part, 'partname', ''))
-            extension = os.path.splitext(partname)[1].lower()
-            if not extension:
-                content_type = getattr(image_part, 'content_type', '')
-                extension = self._extension_from_content_type(content_type)
-
-            return image_bytes, extension
-        except Exception as exc:
-            logger.warning(f"提取图片失败: {exc}")
-            return None
-
-    @staticmethod
-    def _extension_from_content_type(content_type: str) -> str:
-        mapping = {
-            'image/jpeg': '.jpg',
-            'image/png': '.png',
-            'image/gif': '.gif',
-            'image/bmp': '.bmp',
-            'image/tiff': '.tiff',
-            'image/x-emf': '.emf',
-            'image/x-wmf': '.wmf',
-        }
-        return mapping.get(content_type.lower(), '')
-
     def save_image_data(self, image_data: bytes, filepath: str) -> bool:
         """将图片字节写入文件"""
         try:
-            os.makedirs(os.path.dirname(filepath), exist_ok=True)
             with open(filepath, 'wb') as f:
                 f.write(image_data)
             return True
@@ -18,13 +18,24 @@ def check_image_paths():
     
     session = SessionLocal()
     try:
-        # 获取前10个图片记录
-        images = session.query(QuestionImage).limit(10).all()
+        # 获取前10个图片记录（只取需要的列，无需构建完整ORM对象）
+        images = session.query(
+            QuestionImage.id,
+            QuestionImage.image_path,
+            QuestionImage.image_type,
+            QuestionImage.context_text
+        ).limit(10).all()
         
         print(f"📊 数据库中的图片记录: {len(images)}")
         
         upload_dir = "uploads"
         images_dir = os.path.join(upload_dir, "images")
+        # 一次遍历目录（含 ab/cd 分片子目录），之后用集合判断文件是否存在，避免逐条 stat
+        files = []
+        for dir_path, _, names in os.walk(images_dir):
+            rel_dir = os.path.relpath(dir_path, images_dir).replace(os.sep, '/')
+            files.extend(name if rel_dir == '.' else f"{rel_dir}/{name}" for name in names)
+        existing_files = set(files)
         
         for i, img in enumerate(images):
             print(f"\n{i+1}. 图片ID: {img.id}")
@@ -35,14 +46,13 @@ def check_image_paths():
             # 检查文件是否存在
             if img.image_path:
                 full_path = os.path.join(images_dir, img.image_path)
-                exists = os.path.exists(full_path)
+                exists = img.image_path in existing_files
                 print(f"   文件存在: {'✅' if exists else '❌'} {full_path}")
         
         # 检查实际文件
         print(f"\n📁 实际图片文件:")
         if os.path.exists(images_dir):
-            files = os.listdir(images_dir)[:10]
-            for i, file in enumerate(files):
+            for i, file in enumerate(files[:10]):
                 print(f"  {i+1}. {file}")
         
     except Exception as e:
@@ -6,68 +6,71 @@
 
 import sys
 import os
+import re
 sys.path.append(os.path.join(os.path.dirname(__file__), '..'))
 
 from sqlalchemy.orm import Session
 from app.db.database import get_db
 from app.models.question import Question
 
+# 要删除的广告文字列表
+AD_TEXTS = [
+    "【认准淘宝店铺：通关达人资料库】",
+    "认准淘宝店铺：通关达人资料库",
+    "【通关达人资料库】",
+    "通关达人资料库"
+]
+# 合并为一个正则，长的在前，保证带括号的完整广告优先匹配；每条解析只需扫描一遍
+AD_PATTERN = re.compile('|'.join(re.escape(t) for t in sorted(AD_TEXTS, key=len, reverse=True)))
+
 def clean_ad_text():
     """清理题目解析中的广告文字"""
     
-    # 要删除的广告文字列表
-    ad_texts = [
-        "【认准淘宝店铺：通关达人资料库】",
-        "认准淘宝店铺：通关达人资料库",
-        "【通关达人资料库】",
-        "通关达人资料库"
-    ]
-    
     # 获取数据库会话
     db = next(get_db())
     
     try:
-        # 查询所有有解析的题目
-        questions_with_explanation = db.query(Question).filter(
+        # 查询所有有解析的题目（只取需要的列，更新走批量写入）
+        questions_with_explanation = db.query(
+            Question.id, Question.question_number, Question.answer_explanation
+        ).filter(
             Question.answer_explanation.isnot(None),
             Question.answer_explanation != ""
         ).all()
         
         print(f"找到 {len(questions_with_explanation)} 道有解析的题目")
         
-        cleaned_count = 0
+        # 待批量更新的 {id, answer_explanation}
+        updates = []
         
         for question in questions_with_explanation:
             original_explanation = question.answer_explanation
-            cleaned_explanation = original_explanation
             
             # 检查是否包含广告文字
-            has_ad = False
-            for ad_text in ad_texts:
-                if ad_text in cleaned_explanation:
-                    has_ad = True
-                    cleaned_explanation = cleaned_explanation.replace(ad_text, "")
-                    print(f"题目 {question.id} (题号: {question.question_number}) 发现广告文字: {ad_text}")
+            found_ads = list(dict.fromkeys(m.group() for m in AD_PATTERN.finditer(original_explanation)))
+            for ad_text in found_ads:
+                print(f"题目 {question.id} (题号: {question.question_number}) 发现广告文字: {ad_text}")
             
-            if has_ad:
+            if found_ads:
+                cleaned_explanation = AD_PATTERN.sub("", original_explanation)
                 # 清理多余的空白字符和换行
                 cleaned_explanation = cleaned_explanation.strip()
                 # 移除多余的空行
                 lines = [line.strip() for line in cleaned_explanation.split('\n') if line.strip()]
                 cleaned_explanation = '\n'.join(lines)
                 
-                # 更新数据库
-                question.answer_explanation = cleaned_explanation
-                cleaned_count += 1
+                # 记录待更新内容，循环结束后统一写库
+                updates.append({'id': question.id, 'answer_explanation': cleaned_explanation})
                 
                 print(f"  原文: {original_explanation[:100]}...")
                 print(f"  清理后: {cleaned_explanation[:100]}...")
                 print("-" * 50)
         
-        if cleaned_count > 0:
-            # 提交更改
+        if updates:
+            # 一次批量更新并提交，跳过逐对象的属性追踪与 flush
+            db.bulk_update_mappings(Question, updates)
             db.commit()
-            print(f"\n✅ 成功清理了 {cleaned_count} 道题目的广告文字")
+            print(f"\n✅ 成功清理了 {len(updates)} 道题目的广告文字")
         else:
             print("\n✅ 没有发现包含广告文字的题目")
             
@@ -81,13 +84,6 @@ def clean_ad_text():
 def preview_ad_text():
     """预览包含广告文字的题目（不实际删除）"""
     
-    ad_texts = [
-        "【认准淘宝店铺：通关达人资料库】",
-        "认准淘宝店铺：通关达人资料库",
-        "【通关达人资料库】",
-        "通关达人资料库"
-    ]
-    
     db = next(get_db())
     
     try:
@@ -103,13 +99,12 @@ def preview_ad_text():
         for question in questions_with_explanation:
             explanation = question.answer_explanation
             
-            for ad_text in ad_texts:
-                if ad_text in explanation:
-                    found_count += 1
-                    print(f"\n题目 {question.id} (题号: {question.question_number}, 题型: {question.question_type})")
-                    print(f"发现广告文字: {ad_text}")
-                    print(f"解析内容: {explanation[:200]}...")
-                    break
+            match = AD_PATTERN.search(explanation)
+            if match:
+                found_count += 1
+                print(f"\n题目 {question.id} (题号: {question.question_number}, 题型: {question.question_type})")
+                print(f"发现广告文字: {match.group()}")
+                print(f"解析内容: {explanation[:200]}...")
         
         print(f"\n📊 总计发现 {found_count} 道题目包含广告文字")
         
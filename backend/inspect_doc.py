@@ -1,17 +1,26 @@
 from docx import Document
+from lxml import etree
 import sys
 
+# 段落中含图片的 run 数（与逐 run 检查结果一致，一次XPath完成）
+IMG_RUN_COUNT = etree.XPath(
+    'count(w:r[.//w:drawing or .//pic:pic or .//v:imagedata])',
+    namespaces={
+        'w': 'http://schemas.openxmlformats.org/wordprocessingml/2006/main',
+        'pic': 'http://schemas.openxmlformats.org/drawingml/2006/picture',
+        'v': 'urn:schemas-microsoft-com:vml',
+    },
+)
+
 path = r"..\题目\2025年国家公务员录用考试《行测》题（副省级网友回忆版）.docx"
 start = int(sys.argv[1]) if len(sys.argv) > 1 else 799
 end = int(sys.argv[2]) if len(sys.argv) > 2 else 820
 
 doc = Document(path)
+paragraphs = doc.paragraphs
 for i in range(start, end):
-    text = doc.paragraphs[i].text.strip()
-    images = 0
-    for run in doc.paragraphs[i].runs:
-        xml = getattr(run._element, 'xml', '')
-        if isinstance(xml, str) and ('<w:drawing' in xml or '<pic:pic' in xml or '<v:imagedata' in xml):
-            images += 1
+    para = paragraphs[i]
+    text = para.text.strip()
+    images = int(IMG_RUN_COUNT(para._element))
     if text or images:
         print(i, text.encode('unicode_escape'), images)
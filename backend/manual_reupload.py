@@ -1,17 +1,17 @@
 #!/usr/bin/env python3
 # -*- coding: utf-8 -*-
 """重新导入指定行测 docx 题目并写入数据库"""
-import json
 import os
 import shutil
 import time
 import uuid
 from pathlib import Path
-from datetime import datetime
+from typing import List, Tuple
 
 from docx import Document
+from sqlalchemy import delete, event, insert, inspect, select
 
-from app.db.database import Base, SessionLocal, engine
+from app.db.database import Base, SessionLocal, dumps_json, engine
 from app.models import Question, QuestionImage, ExtractionHistory
 from app.services.question_extractor import HumanLogicQuestionExtractor, QuestionImageExtractor
 
@@ -23,43 +23,158 @@ UPLOAD_DIR = BASE_DIR / 'uploads'
 IMAGES_DIR = UPLOAD_DIR / 'images'
 
 
+def _sqlite_bulk_pragmas(dbapi_connection, connection_record) -> None:
+    """SQLite 导入时使用 WAL 并降低 fsync 频率"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute('PRAGMA journal_mode=WAL')
+    cursor.execute('PRAGMA synchronous=NORMAL')
+    cursor.close()
+
+
+def uuid_batch(n: int) -> List[str]:
+    """一次 os.urandom 生成 n 个 UUID4 字符串，代替逐个调用 uuid.uuid4()"""
+    raw = os.urandom(16 * n)
+    return [str(uuid.UUID(bytes=raw[i * 16:(i + 1) * 16], version=4)) for i in range(n)]
+
+
+def _copy_file_range(source: Path, dest: Path) -> None:
+    """用 os.copy_file_range 在内核中完成复制（同一文件系统上可 reflink/零拷贝）"""
+    with open(source, 'rb') as src, open(dest, 'wb') as dst:
+        remaining = os.fstat(src.fileno()).st_size
+        while remaining > 0:
+            copied = os.copy_file_range(src.fileno(), dst.fileno(), remaining)
+            if copied == 0:
+                # 未到文件末尾就返回0：视为失败，由调用方退回整文件复制，避免留下截断的文档
+                raise OSError(f'copy_file_range 提前结束，剩余 {remaining} 字节未复制: {source}')
+            remaining -= copied
+
+
+def store_source_doc(source: Path, dest: Path) -> None:
+    """把原始文档存入 uploads：优先硬链接，其次内核 copy_file_range，都不行再整文件复制"""
+    try:
+        os.link(source, dest)
+        return
+    except OSError:
+        pass
+    if hasattr(os, 'copy_file_range'):
+        try:
+            _copy_file_range(source, dest)
+            return
+        except OSError:
+            pass
+    shutil.copyfile(source, dest)
+
+
 def ensure_environment() -> None:
     """确保运行环境可用，如目录与数据库表"""
     if not SOURCE_DOC_PATH.exists():
         raise FileNotFoundError(f'找不到原始文档: {SOURCE_DOC_PATH}')
     UPLOAD_DIR.mkdir(parents=True, exist_ok=True)
     IMAGES_DIR.mkdir(parents=True, exist_ok=True)
-    Base.metadata.create_all(bind=engine)
+    # 一次目录查询确认表已齐全，只有缺表时才走 create_all（其逐表 has_table 检查）
+    if not set(Base.metadata.tables).issubset(inspect(engine).get_table_names()):
+        Base.metadata.create_all(bind=engine)
 
 
 def cleanup_existing(session, source_name: str) -> None:
     """删除同名来源的旧题目与图片文件，避免重复数据"""
-    existing_questions = session.query(Question).filter(Question.source == source_name).all()
-    for question in existing_questions:
-        for image in list(question.images):
-            if image.image_path:
-                image_file = IMAGES_DIR / image.image_path
-                if image_file.exists():
-                    try:
-                        image_file.unlink()
-                    except OSError:
-                        pass
-        session.delete(question)
-    existing_histories = (
-        session.query(ExtractionHistory)
-        .filter(ExtractionHistory.filename == source_name)
-        .all()
+    source_question_ids = select(Question.id).where(Question.source == source_name)
+    # 一次查询取出全部图片路径，不再逐题懒加载 question.images
+    image_paths = session.execute(
+        select(QuestionImage.image_path).where(QuestionImage.question_id.in_(source_question_ids))
+    ).scalars().all()
+    for image_path in image_paths:
+        if image_path:
+            image_file = IMAGES_DIR / image_path
+            if image_file.exists():
+                try:
+                    image_file.unlink()
+                except OSError:
+                    pass
+    # 每张表一条批量 DELETE，代替逐行 session.delete
+    session.execute(
+        delete(QuestionImage)
+        .where(QuestionImage.question_id.in_(source_question_ids))
+        .execution_options(synchronize_session=False)
     )
-    for history in existing_histories:
-        session.delete(history)
+    session.execute(
+        delete(Question)
+        .where(Question.source == source_name)
+        .execution_options(synchronize_session=False)
+    )
+    session.execute(
+        delete(ExtractionHistory)
+        .where(ExtractionHistory.filename == source_name)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def save_questions(session, result, stored_doc_path: Path, source_name: str) -> Tuple[int, int]:
+    """提取每道题的图片，并批量写入题目与图片记录，返回 (题目数, 图片数)"""
+    doc = Document(str(stored_doc_path))
+    image_extractor = QuestionImageExtractor(output_dir=str(IMAGES_DIR))
+
+    # 先收集行数据（预生成ID，外键无需 flush 即可确定），最后用 Core executemany 批量写入
+    question_rows = []
+    image_rows = []
+    question_ids = uuid_batch(len(result['questions']))
+    for qdata, question_id in zip(result['questions'], question_ids):
+        content = qdata.get('content') or {}
+        question_rows.append(dict(
+            id=question_id,
+            title=f"题目{qdata['number']}",
+            content=dumps_json(content, ensure_ascii=False),
+            question_type=qdata.get('section'),
+            question_number=qdata.get('number'),
+            parent_question_id=None,
+            difficulty=None,
+            source=source_name,
+            paragraph_range=qdata.get('paragraph_range'),
+            total_images=content.get('total_images', 0),
+            total_text_length=content.get('total_text_length', 0),
+        ))
+
+        try:
+            images = image_extractor.extract_images_from_question(doc, qdata, question_id)
+        except Exception as exc:
+            images = []
+            print(f'题目{qdata.get("number")}提取图片失败: {exc}')
+
+        for img in images:
+            image_rows.append(dict(
+                id=None,
+                question_id=question_id,
+                image_name=os.path.basename(img.get('filename') or ''),
+                image_path=img.get('filename'),
+                image_type=img.get('image_type'),
+                image_order=img.get('position_in_question'),
+                ocr_text=None,
+                context_text=img.get('context_text'),
+                paragraph_index=img.get('paragraph_index'),
+                position_in_question=img.get('position_in_question'),
+                order_index=img.get('position_in_question'),
+            ))
+
+    # 图片数量在提取完成后才知道，统一批量分配ID
+    for row, image_id in zip(image_rows, uuid_batch(len(image_rows))):
+        row['id'] = image_id
+
+    if question_rows:
+        session.execute(insert(Question.__table__), question_rows)
+    if image_rows:
+        session.execute(insert(QuestionImage.__table__), image_rows)
+    return len(question_rows), len(image_rows)
 
 
 def run_import() -> None:
+    # 需在首次建立连接（create_all）之前注册，保证连接池中的连接都带上 PRAGMA
+    if engine.dialect.name == 'sqlite' and not event.contains(engine, 'connect', _sqlite_bulk_pragmas):
+        event.listen(engine, 'connect', _sqlite_bulk_pragmas)
     ensure_environment()
     source_name = SOURCE_DOC_PATH.name
     temp_file_id = str(uuid.uuid4())
     stored_doc_path = UPLOAD_DIR / f'{temp_file_id}_{source_name}'
-    shutil.copyfile(SOURCE_DOC_PATH, stored_doc_path)
+    store_source_doc(SOURCE_DOC_PATH, stored_doc_path)
 
     extractor = HumanLogicQuestionExtractor()
     start = time.time()
@@ -68,73 +183,29 @@ def run_import() -> None:
 
     session = SessionLocal()
     try:
-        cleanup_existing(session, source_name)
-
-        history = ExtractionHistory(
-            id=str(uuid.uuid4()),
-            filename=source_name,
-            file_path=str(stored_doc_path),
-            total_questions_extracted=result.get('total_questions', 0),
-            total_images_extracted=result.get('total_images', 0),
-            success=result.get('success', False),
-            error_message=result.get('error', ''),
-            extraction_result=json.dumps(result, ensure_ascii=False),
-            processing_time_seconds=processing_seconds,
-        )
-        session.add(history)
+        # 清理旧数据、写入历史与题目图片放在同一个显式事务中，结束时统一提交
+        with session.begin():
+            cleanup_existing(session, source_name)
+
+            history = ExtractionHistory(
+                id=str(uuid.uuid4()),
+                filename=source_name,
+                file_path=str(stored_doc_path),
+                total_questions_extracted=result.get('total_questions', 0),
+                total_images_extracted=result.get('total_images', 0),
+                success=result.get('success', False),
+                error_message=result.get('error', ''),
+                extraction_result=dumps_json(result, ensure_ascii=False),
+                processing_time_seconds=processing_seconds,
+            )
+            session.add(history)
+
+            if result.get('success', False):
+                saved_questions, saved_images = save_questions(session, result, stored_doc_path, source_name)
 
+        # 解析失败时旧数据清理与失败历史已随事务提交，这里再抛出
         if not result.get('success', False):
-            session.commit()
             raise RuntimeError(f"解析失败: {result.get('error', '未知错误')}")
-
-        doc = Document(str(stored_doc_path))
-        image_extractor = QuestionImageExtractor(output_dir=str(IMAGES_DIR))
-
-        saved_questions = 0
-        saved_images = 0
-        for qdata in result['questions']:
-            question_id = str(uuid.uuid4())
-            question = Question(
-                id=question_id,
-                title=f"题目{qdata['number']}",
-                content=json.dumps(qdata.get('content', {}), ensure_ascii=False),
-                question_type=qdata.get('section'),
-                question_number=qdata.get('number'),
-                parent_question_id=None,
-                difficulty=None,
-                source=source_name,
-                paragraph_range=qdata.get('paragraph_range'),
-                total_images=qdata.get('content', {}).get('total_images', 0),
-                total_text_length=qdata.get('content', {}).get('total_text_length', 0),
-            )
-            session.add(question)
-
-            try:
-                images = image_extractor.extract_images_from_question(doc, qdata, question_id)
-            except Exception as exc:
-                images = []
-                print(f'题目{qdata.get("number")}提取图片失败: {exc}')
-
-            for img in images:
-                question_image = QuestionImage(
-                    id=str(uuid.uuid4()),
-                    question_id=question_id,
-                    image_name=os.path.basename(img.get('filename') or ''),
-                    image_path=img.get('filename'),
-                    image_type=img.get('image_type'),
-                    image_order=img.get('position_in_question'),
-                    ocr_text=None,
-                    context_text=img.get('context_text'),
-                    paragraph_index=img.get('paragraph_index'),
-                    position_in_question=img.get('position_in_question'),
-                    order_index=img.get('position_in_question'),
-                    created_at=datetime.utcnow(),
-                )
-                session.add(question_image)
-                saved_images += 1
-            saved_questions += 1
-
-        session.commit()
         print(f'导入完成: 题目 {saved_questions} 道, 图片 {saved_images} 张, 处理耗时 {processing_seconds} 秒')
         print(f'文档已存储至: {stored_doc_path}')
     finally: